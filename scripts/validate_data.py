@@ -2,12 +2,16 @@
 # requires-python = ">=3.12"
 # dependencies = [
 #     "jsonschema>=4.25",
+#     "orjson>=3.10",
 # ]
 # ///
 
 import argparse
-import json
 import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
 
 from jsonschema.exceptions import ValidationError
 from jsonschema.protocols import Validator
@@ -15,32 +19,68 @@ from jsonschema.validators import validator_for
 
 
 def get_schema_validator(file_path: str) -> Validator:
-    with open(file_path, "r") as f:
-        schema = json.load(f)
+    with open(file_path, "rb") as f:
+        schema = orjson.loads(f.read())
         validator_cls = validator_for(schema)
         return validator_cls(schema)
 
 
 def validate_file(file_path: str, validator: Validator) -> None:
-    with open(file_path, "r") as f:
-        instance = json.load(f)
+    with open(file_path, "rb") as f:
+        instance = orjson.loads(f.read())
     validator.validate(instance)
 
 
-def expand_paths(paths: str) -> str:
+_worker_validator: Validator | None = None
+
+
+def init_worker(schema_path: str) -> None:
+    """Build the schema validator once per worker process"""
+    global _worker_validator
+    _worker_validator = get_schema_validator(schema_path)
+
+
+def check_file(file_path: str) -> tuple[str, dict, bool] | None:
+    """Validate a file in a worker process.
+
+    Returns None if the file is valid, otherwise the error message, the
+    annotation kwargs and whether the error counts as a failure."""
+    try:
+        validate_file(file_path, _worker_validator)
+    except ValidationError as e:
+        return f"{type(e).__name__}: {e.message}", {"title": type(e).__name__}, True
+    except orjson.JSONDecodeError as e:
+        annotation = {"title": type(e).__name__, "col": e.colno, "line": e.lineno}
+        return f"{type(e).__name__}: {str(e)}", annotation, True
+    except Exception as e:
+        return f"{type(e).__name__}: {str(e)}", {"title": type(e).__name__}, False
+    return None
+
+
+def iter_json_files(root: str) -> Iterator[str]:
+    """Recursively yield JSON file paths under a folder"""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".json"):
+                    yield entry.path
+
+
+def expand_paths(paths: list[str]) -> list[str]:
     """Expand folders to file paths"""
     file_paths = []
     for path in paths:
         if os.path.isfile(path) and path.endswith(".json"):
-            file_paths.append(file_paths)
+            file_paths.append(path)
         elif os.path.isdir(path):
-            for root, _, file_names in os.walk(path):
-                for file_name in file_names:
-                    if file_name.endswith(".json"):
-                        file_paths.append(os.path.join(root, file_name))
+            file_paths.extend(iter_json_files(path))
         else:
             raise Exception(f"Could not find file or directory at path: {path}")
-    return file_paths
+    # Overlapping arguments (e.g. a folder and a file inside it) list files twice
+    return list(dict.fromkeys(file_paths))
 
 
 def annotate_error(file_path: str, message: str, **kwargs) -> None:
@@ -65,49 +105,41 @@ def main() -> None:
         help="File path to the JSON schema",
         required=True,
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of worker processes (defaults to the number of CPUs)",
+    )
     args = parser.parse_args()
+    # Fail fast on a missing or invalid schema before walking the data
+    validator = get_schema_validator(args.schema_path)
+    validator.check_schema(validator.schema)
     file_paths = expand_paths(args.paths)
     num_passed = 0
     num_failed = 0
-    validator = get_schema_validator(args.schema_path)
+    num_workers = args.jobs or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(file_paths) // (num_workers * 4)))
     print()
     print(f"Validating {len(file_paths)} JSON files...")
     print()
-    for file_path in file_paths:
-        try:
-            validate_file(file_path, validator)
-            num_passed += 1
-        except ValidationError as e:
-            message = f"{type(e).__name__}: {e.message}"
-            annotate_error(
-                file_path, f"{type(e).__name__}: {e.message}", title=type(e).__name__
-            )
-            print(f"{file_path}")
-            print("  " + message)
-            print()
-            num_failed += 1
-        except json.JSONDecodeError as e:
-            # e.colno
-            message = f"{type(e).__name__}: {str(e)}"
-            annotate_error(
-                file_path,
-                f"{type(e).__name__}: {str(e)}",
-                title=type(e).__name__,
-                col=e.colno,
-                line=e.lineno,
-            )
-            print(f"{file_path}")
-            print("  " + message)
-            print()
-            num_failed += 1
-        except Exception as e:
-            message = f"{type(e).__name__}: {str(e)}"
-            annotate_error(
-                file_path, f"{type(e).__name__}: {str(e)}", title=type(e).__name__
-            )
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=init_worker,
+        initargs=(args.schema_path,),
+    ) as executor:
+        errors = executor.map(check_file, file_paths, chunksize=chunksize)
+        for file_path, error in zip(file_paths, errors):
+            if error is None:
+                num_passed += 1
+                continue
+            message, annotation, failed = error
+            annotate_error(file_path, message, **annotation)
             print(f"{file_path}")
             print("  " + message)
             print()
+            if failed:
+                num_failed += 1
     print(f"{num_passed} file(s) passed; {num_failed} file(s) failed")
     print()
     if num_failed > 0: